@@ -3,6 +3,7 @@ import logging
 import time
 from pathlib import Path
 from src.auto_ui_test.gui_handler import GUIHandler
+from src.auto_ui_test.result_cache import ResultCache
 from src.auto_ui_test.action_recorder import (
     UserActionRecorder,
 )  # Ensure this import points to your recorder module
@@ -16,21 +17,46 @@ logging.basicConfig(
 )
 
 
-def run_from_config(handler, config_path):
+def run_from_config(handler, config_path, cache=None):
     with open(config_path, "r") as file:
         config = json.load(file)
     elements = config["elements"]
 
-    for element in elements:
+    skip_steps = False
+    if cache:
+        fingerprints = cache.fingerprint_steps(elements)
+        config_fingerprint = cache.fingerprint_config(fingerprints)
+        if cache.should_skip(config_fingerprint, str(config_path), scope="config"):
+            cache.touch(fingerprints)
+            print(f"Skipping unchanged config {config_path}.")
+            return
+        # A spot-checked config runs every step; otherwise unchanged steps are
+        # sampled individually.
+        skip_steps = not cache.passed_before(config_fingerprint)
+    all_passed = True
+
+    for index, element in enumerate(elements):
         handler.perform_action(element)
         time.sleep(5)
+        # The action always runs so later steps start from the expected UI state;
+        # only the capture and comparison are skipped for unchanged steps.
+        if skip_steps and cache.should_skip(fingerprints[index], element["name"]):
+            print(f"Skipping unchanged step {element['name']}.")
+            continue
         new_screenshot = f'{element["name"].replace(" ", "_").replace(".", "")}_{int(time.time())}.png'
-        new_screenshot_path = handler.screenshot(new_screenshot, element["name"])
+        new_screenshot_path = handler.screenshot(
+            new_screenshot, element["name"], monitor=handler.monitor_for(element)
+        )
         reference_screenshot = element.get("expected_output")
 
-        if reference_screenshot and not handler.compare_screenshots(
-            reference_screenshot, new_screenshot_path
-        ):
+        passed = not reference_screenshot or handler.compare_screenshots(
+            reference_screenshot, new_screenshot_path, name=element["name"]
+        )
+        all_passed = all_passed and passed
+        if cache:
+            cache.store(fingerprints[index], element["name"], passed)
+
+        if not passed:
             print(
                 f"Difference found for {element['name']}. Reference: {reference_screenshot}, New: {new_screenshot_path}"
             )
@@ -42,6 +68,16 @@ def run_from_config(handler, config_path):
                 f"No differences found for {element['name']}. Reference matches new screenshot."
             )
 
+    if cache:
+        cache.store(config_fingerprint, str(config_path), all_passed)
+
+
+def parse_spot_check_rate(value):
+    rate = float(value)
+    if not 0.0 <= rate <= 1.0:
+        raise argparse.ArgumentTypeError("must be between 0 and 1")
+    return rate
+
 
 def start_recording(recorder):
     recorder.start_recording()
@@ -55,7 +91,7 @@ def start_recording(recorder):
         return recorder.save_to_json()
 
 
-def main(config_path=None):
+def main(config_path=None, build_id=None, spot_check_rate=0.0):
     # Define the base directory for input and output
     base_dir = Path(__file__).parent
 
@@ -63,7 +99,26 @@ def main(config_path=None):
     handler = GUIHandler(base_dir)
 
     if config_path:
-        run_from_config(handler, config_path)
+        # Incremental mode is enabled by supplying the application build ID
+        cache = (
+            ResultCache(
+                base_dir / "result_cache",
+                build_id,
+                {"spot_check_rate": spot_check_rate},
+            )
+            if build_id
+            else None
+        )
+        run_from_config(handler, config_path, cache)
+        if cache:
+            cache.save()
+            skip_report = cache.write_skip_report(base_dir / "skipped_steps.json")
+            handler.report.add_skipped(cache.skipped, skip_report)
+            print(f"Skipped {len(cache.skipped)} unchanged items, see {skip_report}")
+        # Written on every run, including fully skipped ones, so the index
+        # never shows an earlier run's results.
+        report_path = handler.write_report()
+        print(f"Visual diff report saved to {report_path}")
     else:
         # Initialize the UserActionRecorder
         recorder = UserActionRecorder(base_dir)
@@ -78,6 +133,27 @@ if __name__ == "__main__":
     parser.add_argument(
         "--config", type=str, help="Path to the JSON configuration file."
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip steps whose definition, reference images and build are unchanged.",
+    )
+    parser.add_argument(
+        "--build-id", type=str, help="Application build ID used by --incremental."
+    )
+    parser.add_argument(
+        "--spot-check",
+        type=parse_spot_check_rate,
+        help="Fraction of unchanged steps to run anyway in incremental mode.",
+    )
     args = parser.parse_args()
+    if args.incremental and not args.build_id:
+        parser.error("--incremental requires --build-id")
+    if args.spot_check is not None and not args.incremental:
+        parser.error("--spot-check requires --incremental")
 
-    main(config_path=args.config)
+    main(
+        config_path=args.config,
+        build_id=args.build_id if args.incremental else None,
+        spot_check_rate=args.spot_check or 0.0,
+    )
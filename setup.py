@@ -19,6 +19,7 @@ setup(
         "scikit-image",
         "pandas",
         "pynput",
+        "mss",
     ],
     classifiers=[
         "Programming Language :: Python :: 3",
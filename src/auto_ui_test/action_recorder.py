@@ -9,8 +9,11 @@ import os
 import re
 from pathlib import Path
 import pyautogui
+from mss.exception import ScreenShotError
 from pynput import mouse, keyboard
 
+from .monitors import capture_monitor, get_monitor_layout
+
 
 class UserActionRecorder:
     """
@@ -26,6 +29,7 @@ class UserActionRecorder:
         self.state = {"last_action_time": time.time(), "recording": False}
         self.listeners = {}
         self.lock = threading.Lock()
+        self.monitor_layout = get_monitor_layout()
 
     def start_recording(self):
         """Start recording mouse and keyboard actions."""
@@ -60,8 +64,9 @@ class UserActionRecorder:
             text = key.char
         except AttributeError:
             text = str(key)
+        position = pyautogui.position()
         self.record_action(
-            {"action_type": "type", "x": pyautogui.position().x, "text": text}
+            {"action_type": "type", "x": position.x, "y": position.y, "text": text}
         )
         with self.lock:
             self.state["last_action_time"] = time.time()
@@ -79,12 +84,12 @@ class UserActionRecorder:
         button = action_params.get("button")
         text = action_params.get("text")
 
-        monitor = self.get_monitor(x)
+        monitor, local_x, local_y = self.monitor_layout.to_local(x, y)
         sanitized_text = re.sub(r"[^a-zA-Z0-9]", "_", str(text)) if text else None
         filename_base = (
             f"{action_type}_{sanitized_text or f'{x}_{y}'}_{int(time.time())}"
         )
-        screenshot_path = self.capture_screenshot(f"{filename_base}.png")
+        screenshot_path = self.capture_screenshot(f"{filename_base}.png", monitor)
         bounding_box_screenshot_path = self.capture_bounding_box_screenshot(
             f"bbox_{filename_base}.png"
         )
@@ -92,9 +97,15 @@ class UserActionRecorder:
             "action": action_type,
             "x": x,
             "y": y,
-            "monitor": monitor,
-            "screenshot": str(screenshot_path),
-            "bounding_box_screenshot": str(bounding_box_screenshot_path),
+            **monitor.describe(),
+            "monitor_x": local_x,
+            "monitor_y": local_y,
+            "screenshot": str(screenshot_path) if screenshot_path else None,
+            "bounding_box_screenshot": (
+                str(bounding_box_screenshot_path)
+                if bounding_box_screenshot_path
+                else None
+            ),
         }
         if button:
             action["button"] = button
@@ -155,33 +166,62 @@ class UserActionRecorder:
         """Perform the recorded action."""
         try:
             if action["action"] == "click":
-                pyautogui.click(action["x"], action["y"])
+                pyautogui.click(*self.get_action_position(action))
             elif action["action"] == "type":
                 pyautogui.typewrite(action["text"])
         except (pyautogui.FailSafeException, pyautogui.ImageNotFoundException) as error:
             print(f"Error performing action {action}: {error}")
 
-    def capture_screenshot(self, filename):
-        """Capture a screenshot of the entire screen."""
-        screenshot = pyautogui.screenshot()
-        screenshot_path = self.screenshots_dir / filename
-        screenshot.save(screenshot_path)
-        return screenshot_path
+    def get_action_position(self, action):
+        """Map a recorded action onto the current virtual desktop coordinates."""
+        if "monitor_x" in action and "monitor_y" in action:
+            monitor = self.monitor_layout.resolve_element(action)
+            return monitor.to_global(action["monitor_x"], action["monitor_y"])
+        return action["x"], action["y"]
+
+    def capture_screenshot(self, filename, monitor=None):
+        """Capture a screenshot of the monitor the action was performed on."""
+        return self._save_capture(filename, monitor or self.monitor_layout.primary)
 
     def capture_bounding_box_screenshot(self, filename):
-        """Capture a screenshot of the bounding box."""
+        """Capture a screenshot of the bounding box, clamped to its monitor."""
         region = self.settings["bounding_box"]
-        screenshot = (
-            pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        if not region:
+            return self._save_capture(filename, self.monitor_layout.primary)
+        monitor = self.monitor_layout.to_local(
+            region[0] + region[2] // 2, region[1] + region[3] // 2
+        )[0]
+        local_x, local_y = monitor.to_local(region[0], region[1])
+        return self._save_capture(
+            filename, monitor, (local_x, local_y, region[2], region[3])
         )
-        screenshot_path = self.screenshots_dir / filename
-        screenshot.save(screenshot_path)
-        return screenshot_path
-
-    def get_monitor(self, x):
-        """Determine which monitor the action is performed on."""
-        screen_width, _ = pyautogui.size()
-        return (x // screen_width) + 1
+
+    def _save_capture(self, filename, monitor, region=None):
+        """
+        Capture a monitor or a region of it and save it.
+
+        Errors are logged rather than raised, since this runs inside the
+        listener callbacks and an exception there would stop the recording.
+        """
+        try:
+            screenshot = capture_monitor(monitor, region)
+            screenshot_path = self.screenshots_dir / filename
+            screenshot.save(screenshot_path)
+            return screenshot_path
+        except (ScreenShotError, ValueError, OSError) as error:
+            print(f"Error capturing screenshot {filename}: {error}")
+            return None
+
+    def get_monitor(self, x, y=None):
+        """
+        Determine which monitor the action is performed on.
+
+        Without y, the point is taken on the primary monitor's top edge, so
+        x-only callers still get a monitor number for side-by-side layouts.
+        """
+        if y is None:
+            y = self.monitor_layout.primary.y
+        return self.monitor_layout.to_local(x, y)[0].index
 
 
 # Example usage (should be placed in a separate script or the main function)
@@ -13,9 +13,12 @@ from pathlib import Path
 import cv2
 import easyocr
 import pyautogui
-from screeninfo import get_monitors
+from mss.exception import ScreenShotError
 from skimage.metrics import structural_similarity as ssim
 
+from .monitors import capture_monitor, get_monitor_layout
+from .report import VisualDiffReport
+
 
 class GUIHandler:
     """
@@ -44,28 +47,93 @@ class GUIHandler:
         self.base_dir = base_dir
         self.screenshots_dir = self.base_dir / "screenshots"
         self.differences_dir = self.base_dir / "differences"
-        self.matchable_areas_dir = self.base_dir / "matchable_areas"
+        self.report = VisualDiffReport(self.differences_dir)
         self.ocr_reader = easyocr.Reader(["en"])
         self.logs = []
         self.screen_settings = self.ScreenSettings(0, 0, 0, 0)
+        self.monitor_layout = None
 
         os.makedirs(self.screenshots_dir, exist_ok=True)
         os.makedirs(self.differences_dir, exist_ok=True)
-        os.makedirs(self.matchable_areas_dir, exist_ok=True)
 
         self._initialize_monitor_settings()
 
     def _initialize_monitor_settings(self):
-        """Initialize settings for the primary monitor."""
-        monitors = get_monitors()
-        primary_monitor = next(
-            (monitor for monitor in monitors if monitor.is_primary), monitors[0]
-        )
+        """Initialize the monitor layout and settings for the primary monitor."""
+        self.monitor_layout = get_monitor_layout()
+        primary_monitor = self.monitor_layout.primary
         self.screen_settings.x = primary_monitor.x
         self.screen_settings.y = primary_monitor.y
         self.screen_settings.width = primary_monitor.width
         self.screen_settings.height = primary_monitor.height
 
+    def monitor_for(self, element):
+        """
+        Find the monitor a config step or recorded action belongs to.
+
+        Args:
+            element (dict): Step with optional "monitor", "monitor_name" and
+                "monitor_geometry" fields.
+
+        Returns:
+            Monitor: The matching monitor, or the primary monitor.
+        """
+        return self.monitor_layout.resolve_element(element)
+
+    def perform_action(self, element):
+        """
+        Perform the action of a config step or recorded action.
+
+        Click positions are taken from "monitor_x"/"monitor_y" on the step's
+        monitor, then from "coordinates", then from the desktop "x"/"y", and
+        finally by locating "element_image" on that monitor.
+
+        Args:
+            element (dict): Step definition from the config.
+        """
+        action = element.get("action")
+        description = element.get("description", element.get("name", action))
+        monitor = self.monitor_for(element)
+        if action in ("click", "input_text"):
+            position = self._element_position(element, monitor)
+            if position:
+                self.click(*position, description=description, monitor=monitor)
+            elif action == "click":
+                logging.error("No position found for %s", description)
+        if action in ("type", "input_text"):
+            self.type_text(element.get("text_value", element.get("text", "")))
+        elif action == "key":
+            self.press_key(element["key"], description)
+        elif action != "click":
+            logging.error("Unsupported action %s for %s", action, description)
+
+    def _element_position(self, element, monitor):
+        """Return the position of a step relative to its monitor, or None."""
+        if "monitor_x" in element and "monitor_y" in element:
+            return element["monitor_x"], element["monitor_y"]
+        if "coordinates" in element:
+            return element["coordinates"]["x"], element["coordinates"]["y"]
+        if element.get("x") is not None and element.get("y") is not None:
+            return monitor.to_local(element["x"], element["y"])
+        if element.get("element_image"):
+            try:
+                box = pyautogui.locate(
+                    element["element_image"], capture_monitor(monitor)
+                )
+            except (
+                pyautogui.ImageNotFoundException,
+                ScreenShotError,
+                OSError,
+            ) as error:
+                logging.error(
+                    "Failed to locate %s: %s", element["element_image"], error
+                )
+                return None
+            if box:
+                center = pyautogui.center(box)
+                return center.x, center.y
+        return None
+
     def run_app(self, app_name):
         """
         Run an application and maximize it.
@@ -132,37 +200,28 @@ class GUIHandler:
         pyautogui.write(f"{app_name} &")
         pyautogui.press("enter")
 
-    def click(self, x, y, description="Click"):
+    def click(self, x, y, description="Click", monitor=None):
         """
         Simulate a click and log the action.
 
         Args:
-            x (int): X-coordinate for the click.
-            y (int): Y-coordinate for the click.
+            x (int): X-coordinate for the click, relative to the monitor.
+            y (int): Y-coordinate for the click, relative to the monitor.
             description (str): Description of the click action.
+            monitor (Monitor): Monitor to click on; defaults to the primary monitor.
         """
+        target = monitor or self.monitor_layout.primary
+        global_x, global_y = target.to_global(x, y)
         try:
-            pyautogui.moveTo(
-                self.screen_settings.x + 10, self.screen_settings.y + 10
-            )  # Safe position
+            pyautogui.moveTo(*target.to_global(10, 10))  # Safe position
             time.sleep(1)
-            pyautogui.click(self.screen_settings.x + x, self.screen_settings.y + y)
-            self.logs.append(
-                f"{description} at ({self.screen_settings.x + x}, {self.screen_settings.y + y})"
-            )
-            logging.info(
-                "%s at (%d, %d)",
-                description,
-                self.screen_settings.x + x,
-                self.screen_settings.y + y,
-            )
+            pyautogui.click(global_x, global_y)
+            self.logs.append(f"{description} at ({global_x}, {global_y})")
+            logging.info("%s at (%d, %d)", description, global_x, global_y)
             time.sleep(2)
         except (pyautogui.FailSafeException, OSError) as error:
             logging.error(
-                "Failed to click at (%d, %d): %s",
-                self.screen_settings.x + x,
-                self.screen_settings.y + y,
-                error,
+                "Failed to click at (%d, %d): %s", global_x, global_y, error
             )
 
     def press_key(self, key, description="Key Press"):
@@ -181,30 +240,40 @@ class GUIHandler:
         except (pyautogui.FailSafeException, OSError) as error:
             logging.error("Failed to press key '%s': %s", key, error)
 
-    def screenshot(self, file_name, description="Screenshot"):
+    def type_text(self, text, description="Type"):
         """
-        Take a screenshot of the primary monitor and save it.
+        Simulate typing text and log the action.
+
+        Args:
+            text (str): Text to type.
+            description (str): Description of the typing action.
+        """
+        try:
+            pyautogui.write(text)
+            self.logs.append(f"{description} '{text}'")
+            logging.info("%s '%s'", description, text)
+            time.sleep(1)
+        except (pyautogui.FailSafeException, OSError) as error:
+            logging.error("Failed to type '%s': %s", text, error)
+
+    def screenshot(self, file_name, description="Screenshot", monitor=None):
+        """
+        Take a screenshot of a single monitor and save it.
 
         Args:
             file_name (str): Name of the file to save the screenshot.
             description (str): Description of the screenshot action.
+            monitor (Monitor): Monitor to capture; defaults to the primary monitor.
         """
         try:
-            screenshot = pyautogui.screenshot(
-                region=(
-                    self.screen_settings.x,
-                    self.screen_settings.y,
-                    self.screen_settings.width,
-                    self.screen_settings.height,
-                )
-            )
+            screenshot = capture_monitor(monitor or self.monitor_layout.primary)
             screenshot_path = self.screenshots_dir / file_name
             screenshot.save(screenshot_path)
             self.logs.append(f"{description} saved as {file_name}")
             logging.info("%s saved as %s", description, file_name)
             time.sleep(1)
             return screenshot_path
-        except (pyautogui.FailSafeException, OSError) as error:
+        except (pyautogui.FailSafeException, OSError, ScreenShotError) as error:
             logging.error("Failed to take screenshot %s: %s", file_name, error)
             return None
 
@@ -222,14 +291,17 @@ class GUIHandler:
         """
         return cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
 
-    def compare_screenshots(self, img1_path, img2_path, threshold=0.8):
+    def compare_screenshots(self, img1_path, img2_path, threshold=0.8, name=None):
         """
         Compare two screenshots using SSIM and return True if they are similar.
 
+        The comparison is recorded for the visual diff report, see `write_report`.
+
         Args:
             img1_path (Path): Path to the first image.
             img2_path (Path): Path to the second image.
             threshold (float): Similarity threshold for comparison.
+            name (str): Label of the comparison in the report.
 
         Returns:
             bool: True if images are similar, False otherwise.
@@ -253,10 +325,18 @@ class GUIHandler:
                 thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
             )
 
-            self._mark_matchable_areas(img1, contours, img1_path, "img1")
-            self._mark_matchable_areas(img2_resized, contours, img2_path, "img2")
-
-            return score >= threshold
+            similar = score >= threshold
+            self.report.add(
+                {
+                    "name": name or Path(img2_path).stem,
+                    "reference": img1_path,
+                    "new": img2_path,
+                    "score": score,
+                    "similar": similar,
+                    "regions": [cv2.boundingRect(contour) for contour in contours],
+                }
+            )
+            return similar
         except (cv2.error, ValueError) as error:
             logging.error(
                 "Failed to compare screenshots %s and %s: %s",
@@ -266,19 +346,17 @@ class GUIHandler:
             )
             return False
 
-    def _mark_matchable_areas(self, image, contours, img_path, label):
-        """Mark matchable areas on the image based on contours and save it."""
-        marked_image = image.copy()
-        for contour in contours:
-            (x, y, w, h) = cv2.boundingRect(contour)
-            cv2.rectangle(marked_image, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-        marked_image_path = (
-            self.matchable_areas_dir
-            / f"matchable_areas_{label}_{Path(img_path).stem}.png"
-        )
-        cv2.imwrite(str(marked_image_path), marked_image)
-        logging.info("Marked matchable areas saved as %s", marked_image_path)
+    def write_report(self):
+        """
+        Write the visual diff report for all comparisons made so far.
+
+        The index is rewritten even without comparisons, so a previous run's
+        report is never left in place.
+
+        Returns:
+            Path: Path to the report index.
+        """
+        return self.report.generate()
 
     def extract_text(self, image_path):
         """
@@ -0,0 +1,313 @@
+"""
+Module describing the monitor topology of the virtual desktop, mapping points to
+monitors, translating coordinates and capturing individual monitors.
+"""
+
+import bisect
+import functools
+import logging
+
+import mss
+from PIL import Image
+from screeninfo import get_monitors
+
+
+class Monitor:
+    """
+    A single monitor placed on the virtual desktop.
+    """
+
+    def __init__(self, index, region, is_primary=False, name=None):
+        """
+        Initialize the Monitor.
+
+        Args:
+            index (int): 1-based monitor number.
+            region (tuple): (x, y, width, height) of the monitor on the virtual
+                desktop.
+            is_primary (bool): Whether this is the primary monitor.
+            name (str): Device name reported by the operating system, if any.
+        """
+        self.index = index
+        self.x, self.y, self.width, self.height = region
+        self.is_primary = is_primary
+        self.name = name
+
+    def __repr__(self):
+        return (
+            f"Monitor(index={self.index}, x={self.x}, y={self.y}, "
+            f"width={self.width}, height={self.height}, "
+            f"is_primary={self.is_primary}, name={self.name!r})"
+        )
+
+    @property
+    def region(self):
+        """tuple: The monitor area as (x, y, width, height)."""
+        return (self.x, self.y, self.width, self.height)
+
+    @property
+    def bbox(self):
+        """tuple: The monitor area as (left, top, right, bottom)."""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def describe(self):
+        """
+        Describe the monitor for recorded actions.
+
+        The index alone is not stable across sessions, so the device name and
+        geometry are stored alongside it and preferred when resolving on replay.
+
+        Returns:
+            dict: The "monitor", "monitor_name" and "monitor_geometry" fields.
+        """
+        return {
+            "monitor": self.index,
+            "monitor_name": self.name,
+            "monitor_geometry": list(self.region),
+        }
+
+    def contains(self, x, y):
+        """Return True if the virtual desktop point (x, y) lies on this monitor."""
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+    def to_local(self, x, y):
+        """Translate virtual desktop coordinates to coordinates on this monitor."""
+        return x - self.x, y - self.y
+
+    def to_global(self, x, y):
+        """Translate coordinates on this monitor to virtual desktop coordinates."""
+        return self.x + x, self.y + y
+
+
+class MonitorLayout:
+    """
+    The arrangement of all monitors on the virtual desktop.
+
+    The desktop is split into vertical slabs at every monitor's left and right
+    edge. Each slab keeps the monitors overlapping it sorted by their top edge,
+    so a point is resolved with one bisection on x followed by one on y.
+    """
+
+    def __init__(self, monitors):
+        """
+        Initialize the MonitorLayout.
+
+        Args:
+            monitors (list[Monitor]): Monitors making up the virtual desktop.
+        """
+        if not monitors:
+            raise ValueError("At least one monitor is required")
+        self.monitors = list(monitors)
+        self.primary = next(
+            (monitor for monitor in self.monitors if monitor.is_primary),
+            self.monitors[0],
+        )
+        self._edges = sorted(
+            {
+                edge
+                for monitor in self.monitors
+                for edge in (monitor.x, monitor.x + monitor.width)
+            }
+        )
+        self._slabs = []
+        for left in self._edges[:-1]:
+            column = sorted(
+                (
+                    monitor
+                    for monitor in self.monitors
+                    if monitor.x <= left < monitor.x + monitor.width
+                ),
+                key=lambda monitor: monitor.y,
+            )
+            self._slabs.append(([monitor.y for monitor in column], column))
+
+    @classmethod
+    def from_screeninfo(cls):
+        """Build the layout from the monitors reported by screeninfo."""
+        return cls(
+            [
+                Monitor(
+                    index,
+                    (monitor.x, monitor.y, monitor.width, monitor.height),
+                    bool(monitor.is_primary),
+                    monitor.name,
+                )
+                for index, monitor in enumerate(get_monitors(), start=1)
+            ]
+        )
+
+    def __len__(self):
+        return len(self.monitors)
+
+    def __iter__(self):
+        return iter(self.monitors)
+
+    def get(self, index):
+        """
+        Return the monitor with the given 1-based index.
+
+        Args:
+            index (int): Monitor number, as recorded in action files.
+
+        Returns:
+            Monitor: The matching monitor, or the primary monitor if unknown.
+        """
+        if index is not None and 1 <= index <= len(self.monitors):
+            return self.monitors[index - 1]
+        return self.primary
+
+    def resolve(self, index=None, name=None, geometry=None):
+        """
+        Find a recorded monitor in the current layout.
+
+        The device name is tried first, then the geometry and finally the index.
+        A warning is logged whenever it has to fall back on the index or on
+        the primary monitor.
+
+        Args:
+            index (int): Recorded 1-based monitor number.
+            name (str): Recorded device name.
+            geometry (list): Recorded (x, y, width, height) of the monitor.
+
+        Returns:
+            Monitor: The matching monitor, or the primary monitor if none matches.
+        """
+        if name:
+            for monitor in self.monitors:
+                if monitor.name == name:
+                    return monitor
+        if geometry:
+            for monitor in self.monitors:
+                if list(monitor.region) == list(geometry):
+                    return monitor
+        monitor = self.get(index)
+        if name or geometry or (index is not None and monitor.index != index):
+            logging.warning(
+                "Recorded monitor %s (%s, %s) not found, using monitor %d",
+                index,
+                name,
+                geometry,
+                monitor.index,
+            )
+        return monitor
+
+    def resolve_element(self, element):
+        """
+        Find the monitor a recorded action or config step refers to.
+
+        Args:
+            element (dict): Action or step with optional "monitor",
+                "monitor_name" and "monitor_geometry" fields.
+
+        Returns:
+            Monitor: The matching monitor, or the primary monitor.
+        """
+        return self.resolve(
+            element.get("monitor"),
+            element.get("monitor_name"),
+            element.get("monitor_geometry"),
+        )
+
+    def monitor_at(self, x, y):
+        """
+        Find the monitor containing a virtual desktop point.
+
+        Args:
+            x (int): X-coordinate on the virtual desktop.
+            y (int): Y-coordinate on the virtual desktop.
+
+        Returns:
+            Monitor: The monitor containing the point, or None if it falls in a gap.
+        """
+        slab = bisect.bisect_right(self._edges, x) - 1
+        if slab < 0 or slab >= len(self._slabs):
+            return None
+        tops, column = self._slabs[slab]
+        position = bisect.bisect_right(tops, y) - 1
+        if position < 0:
+            return None
+        monitor = column[position]
+        return monitor if monitor.contains(x, y) else None
+
+    def to_local(self, x, y):
+        """
+        Translate a virtual desktop point to a monitor and local coordinates.
+
+        Args:
+            x (int): X-coordinate on the virtual desktop.
+            y (int): Y-coordinate on the virtual desktop.
+
+        Returns:
+            tuple: (monitor, local_x, local_y); points outside every monitor are
+            expressed relative to the primary monitor.
+        """
+        monitor = self.monitor_at(x, y) or self.primary
+        local_x, local_y = monitor.to_local(x, y)
+        return monitor, local_x, local_y
+
+    def to_global(self, index, x, y):
+        """
+        Translate coordinates local to a monitor back to the virtual desktop.
+
+        Args:
+            index (int): 1-based monitor number.
+            x (int): X-coordinate on that monitor.
+            y (int): Y-coordinate on that monitor.
+
+        Returns:
+            tuple: (x, y) on the virtual desktop.
+        """
+        return self.get(index).to_global(x, y)
+
+
+@functools.lru_cache(maxsize=1)
+def _cached_layout():
+    return MonitorLayout.from_screeninfo()
+
+
+def get_monitor_layout(refresh=False):
+    """
+    Return the cached monitor layout, querying screeninfo only on first use.
+
+    Args:
+        refresh (bool): Rebuild the layout, e.g. after monitors were plugged in.
+
+    Returns:
+        MonitorLayout: The current monitor layout.
+    """
+    if refresh:
+        _cached_layout.cache_clear()
+    return _cached_layout()
+
+
+def capture_monitor(monitor, region=None):
+    """
+    Capture a single monitor, or a region of it.
+
+    Only the requested rectangle is copied from the screen. A region reaching
+    past the monitor's edges is clamped to the monitor.
+
+    Args:
+        monitor (Monitor): Monitor to capture.
+        region (tuple): Optional (x, y, width, height) local to the monitor.
+
+    Returns:
+        PIL.Image.Image: The captured image.
+
+    Raises:
+        ValueError: If the region lies entirely outside the monitor.
+        mss.exception.ScreenShotError: If the screen cannot be grabbed.
+    """
+    if region is None:
+        region = (0, 0, monitor.width, monitor.height)
+    left, top = max(0, region[0]), max(0, region[1])
+    width = min(monitor.width, region[0] + region[2]) - left
+    height = min(monitor.height, region[1] + region[3]) - top
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Region {region} lies outside {monitor}")
+    left, top = monitor.to_global(left, top)
+    with mss.mss() as screen:
+        shot = screen.grab(
+            {"left": left, "top": top, "width": width, "height": height}
+        )
+    return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
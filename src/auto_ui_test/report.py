@@ -0,0 +1,286 @@
+"""
+Module to build a browsable visual-diff report from screenshot comparisons, with
+diff heatmaps, crops of the changed regions and downsized thumbnails.
+"""
+
+import html
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Visual diff report</title>
+<style>
+body {{ font-family: sans-serif; margin: 1em; }}
+.entry {{ border: 1px solid #ccc; margin-bottom: 1em; padding: 0.5em; }}
+.fail {{ border-color: #c00; }}
+.thumbs img, .crops img {{ margin: 0.25em; vertical-align: top; }}
+.full img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>Visual diff report</h1>
+<p>{summary}</p>
+{skipped}
+{entries}
+<script>
+document.querySelectorAll("details.full").forEach(function (details) {{
+  details.addEventListener("toggle", function () {{
+    details.querySelectorAll("img[data-src]").forEach(function (img) {{
+      img.src = img.dataset.src;
+      img.removeAttribute("data-src");
+    }});
+  }});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+class VisualDiffReport:
+    """
+    Collects screenshot comparisons and renders them into a static HTML report.
+
+    Only downsized thumbnails and crops of the changed regions are written;
+    the full-size screenshots are linked from the report and loaded on demand.
+    """
+
+    CROP_PADDING = 8
+    HEATMAP_GAIN = 4
+    IMAGE_PATTERN = "[0-9][0-9][0-9][0-9]_*.png"
+
+    def __init__(
+        self, output_dir, thumbnail_width=320, max_crops=12, max_workers=None
+    ):
+        """
+        Initialize the VisualDiffReport.
+
+        Args:
+            output_dir (Path): Directory for the report index and its images.
+            thumbnail_width (int): Maximum width of generated thumbnails.
+            max_crops (int): Maximum number of changed regions cropped per comparison.
+            max_workers (int): Number of worker threads used to render images.
+        """
+        self.output_dir = Path(output_dir)
+        self.thumbnail_width = thumbnail_width
+        self.max_crops = max_crops
+        self.max_workers = max_workers
+        self.entries = []
+        self.skipped = []
+        self.skip_report = None
+
+    def add(self, comparison):
+        """
+        Record a comparison to include in the report.
+
+        Args:
+            comparison (dict): The comparison, with keys
+                "name" (str): label of the comparison,
+                "reference" (Path): path to the reference image,
+                "new" (Path): path to the new image,
+                "score" (float): SSIM score of the comparison,
+                "similar" (bool): whether the images were considered similar,
+                "regions" (list[tuple]): changed regions as (x, y, width, height)
+                in reference image coordinates.
+        """
+        self.entries.append(
+            {
+                "name": comparison["name"],
+                "reference": Path(comparison["reference"]),
+                "new": Path(comparison["new"]),
+                "score": float(comparison["score"]),
+                "similar": bool(comparison["similar"]),
+                "regions": list(comparison["regions"]),
+            }
+        )
+
+    def add_skipped(self, items, skip_report=None):
+        """
+        Record steps and configs that were skipped as unchanged.
+
+        Args:
+            items (list[dict]): Skipped items with "name" and "scope" keys.
+            skip_report (Path): Optional path of the full skip report to link.
+        """
+        self.skipped.extend(items)
+        if skip_report:
+            self.skip_report = Path(skip_report)
+
+    def generate(self):
+        """
+        Render thumbnails, heatmaps and crops in parallel and write the HTML index.
+
+        Returns:
+            Path: Path to the generated index.html.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._clear_previous()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            rendered = list(
+                executor.map(
+                    self._render_entry, range(len(self.entries)), self.entries
+                )
+            )
+
+        failures = sum(1 for entry in self.entries if not entry["similar"])
+        summary = f"{len(self.entries)} comparisons, {failures} with differences"
+        if self.skipped:
+            summary += f", {len(self.skipped)} skipped as unchanged"
+        index_path = self.output_dir / "index.html"
+        with open(index_path, "w", encoding="utf-8") as file:
+            file.write(
+                _PAGE_TEMPLATE.format(
+                    summary=html.escape(summary + "."),
+                    skipped=self._skipped_html(),
+                    entries="\n".join(rendered),
+                )
+            )
+        logging.info("Visual diff report saved as %s", index_path)
+        return index_path
+
+    def _clear_previous(self):
+        """Remove the images written by an earlier report in the output directory."""
+        for stale in self.output_dir.glob(self.IMAGE_PATTERN):
+            try:
+                stale.unlink()
+            except OSError as error:
+                logging.warning(
+                    "Failed to remove stale report image %s: %s", stale, error
+                )
+
+    def _render_entry(self, number, entry):
+        """Write the images for a single comparison and return its HTML fragment."""
+        prefix = f"{number:04d}_{re.sub(r'[^a-zA-Z0-9]', '_', entry['name'])}"
+        try:
+            reference = cv2.imread(str(entry["reference"]))
+            new = cv2.imread(str(entry["new"]))
+            new = cv2.resize(
+                new,
+                (reference.shape[1], reference.shape[0]),
+                interpolation=cv2.INTER_AREA,
+            )
+            images = {
+                "reference": self._write_thumbnail(
+                    reference, f"{prefix}_reference.png"
+                ),
+                "new": self._write_thumbnail(new, f"{prefix}_new.png"),
+                "heatmap": self._write_thumbnail(
+                    self._heatmap(reference, new), f"{prefix}_heatmap.png"
+                ),
+            }
+            crops = self._write_crops(reference, new, entry["regions"], prefix)
+        except (cv2.error, AttributeError, OSError) as error:
+            logging.error(
+                "Failed to render report entry %s: %s", entry["name"], error
+            )
+            images, crops = {}, []
+        return self._entry_html(entry, images, crops)
+
+    def _heatmap(self, reference, new):
+        """
+        Return a colour heatmap of the per-pixel difference between two images.
+
+        The difference is scaled by a fixed gain rather than per image, so the
+        colours mean the same magnitude in every entry of the report.
+        """
+        diff = cv2.absdiff(
+            cv2.cvtColor(reference, cv2.COLOR_BGR2GRAY),
+            cv2.cvtColor(new, cv2.COLOR_BGR2GRAY),
+        )
+        diff = cv2.convertScaleAbs(diff, alpha=self.HEATMAP_GAIN)
+        return cv2.applyColorMap(diff, cv2.COLORMAP_JET)
+
+    def _write_thumbnail(self, image, file_name):
+        """Downsize an image to the thumbnail width, save it and return its name."""
+        height, width = image.shape[:2]
+        if width > self.thumbnail_width:
+            scale = self.thumbnail_width / width
+            image = cv2.resize(
+                image,
+                (self.thumbnail_width, max(1, int(height * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        cv2.imwrite(str(self.output_dir / file_name), image)
+        return file_name
+
+    def _write_crops(self, reference, new, regions, prefix):
+        """Save side-by-side crops of the largest changed regions."""
+        height, width = reference.shape[:2]
+        padding = self.CROP_PADDING
+        largest = sorted(
+            regions, key=lambda region: region[2] * region[3], reverse=True
+        )
+        crops = []
+        for index, (x, y, w, h) in enumerate(largest[: self.max_crops]):
+            left, top = max(0, x - padding), max(0, y - padding)
+            right, bottom = min(width, x + w + padding), min(height, y + h + padding)
+            side_by_side = cv2.hconcat(
+                [reference[top:bottom, left:right], new[top:bottom, left:right]]
+            )
+            crops.append(
+                self._write_thumbnail(side_by_side, f"{prefix}_crop{index}.png")
+            )
+        return crops
+
+    def _relative(self, path):
+        """Return a path usable as a link from the report index."""
+        try:
+            relative = os.path.relpath(path.resolve(), self.output_dir.resolve())
+            return Path(relative).as_posix()
+        except ValueError:
+            return path.resolve().as_uri()
+
+    def _skipped_html(self):
+        """Build the HTML fragment listing skipped steps and configs."""
+        if not self.skipped:
+            return ""
+        items = "".join(
+            f'<li>{html.escape(str(item["name"]))} ({html.escape(item["scope"])})</li>'
+            for item in self.skipped
+        )
+        link = (
+            f' &mdash; <a href="{html.escape(self._relative(self.skip_report))}">'
+            "skip report</a>"
+            if self.skip_report
+            else ""
+        )
+        return (
+            f'<details class="skipped"><summary>Skipped as unchanged{link}</summary>'
+            f"<ul>{items}</ul></details>"
+        )
+
+    def _entry_html(self, entry, images, crops):
+        """Build the HTML fragment describing one comparison."""
+        status = "match" if entry["similar"] else "differences"
+        reference = html.escape(self._relative(entry["reference"]))
+        new = html.escape(self._relative(entry["new"]))
+        thumbs = "".join(
+            f'<img loading="lazy" src="{html.escape(images[key])}" alt="{key}" '
+            f'title="{key}">'
+            for key in ("reference", "new", "heatmap")
+            if key in images
+        )
+        crop_tags = "".join(
+            f'<img loading="lazy" src="{html.escape(crop)}" alt="changed region">'
+            for crop in crops
+        )
+        return (
+            f'<div class="entry{"" if entry["similar"] else " fail"}">'
+            f'<h2>{html.escape(entry["name"])}</h2>'
+            f'<p>SSIM {entry["score"]:.4f} &mdash; {status}, '
+            f'{len(entry["regions"])} changed regions</p>'
+            f'<div class="thumbs">{thumbs}</div>'
+            f'<div class="crops">{crop_tags}</div>'
+            f'<details class="full"><summary>Full-size images</summary>'
+            f'<a href="{reference}"><img data-src="{reference}" alt="reference"></a>'
+            f'<a href="{new}"><img data-src="{new}" alt="new"></a>'
+            f"</details></div>"
+        )
@@ -0,0 +1,265 @@
+"""
+Module to cache step verdicts across runs so unchanged steps can be skipped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+
+class ResultCache:
+    """
+    On-disk cache of step and config verdicts keyed by a fingerprint.
+
+    A step fingerprint covers the step definition, the contents of its
+    `element_image` and `expected_output` files, the application build ID and
+    the fingerprint of the step before it, since each step starts from the
+    screen the earlier steps left behind. Entries are evicted when they are
+    older than `max_age_days` or, least recently used first, when there are
+    more than `max_entries`.
+    """
+
+    DEFAULT_SETTINGS = {"max_entries": 1000, "max_age_days": 30, "spot_check_rate": 0.0}
+
+    def __init__(self, cache_dir, build_id, settings=None):
+        """
+        Initialize the ResultCache.
+
+        Args:
+            cache_dir (Path): Directory holding the cache index.
+            build_id (str): Identifier of the application build under test.
+            settings (dict): Optional overrides of `DEFAULT_SETTINGS`:
+                "max_entries" (int): maximum number of cached verdicts,
+                "max_age_days" (float): age after which a verdict is discarded,
+                "spot_check_rate" (float): fraction of skippable items to run
+                anyway, between 0 and 1.
+        """
+        settings = {**self.DEFAULT_SETTINGS, **(settings or {})}
+        if not 0.0 <= settings["spot_check_rate"] <= 1.0:
+            raise ValueError("spot_check_rate must be between 0 and 1")
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "results.json"
+        self.build_id = str(build_id)
+        self.settings = {
+            "max_entries": settings["max_entries"],
+            "max_age": settings["max_age_days"] * 24 * 60 * 60,
+            "spot_check_rate": settings["spot_check_rate"],
+        }
+        self.entries = {}
+        self.skipped = []
+        self._file_hashes = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Load the cache index from disk, starting empty if it is unreadable."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            logging.warning(
+                "Ignoring unreadable result cache %s: %s", self.index_path, error
+            )
+            return
+        if not isinstance(entries, dict):
+            logging.warning("Ignoring malformed result cache %s", self.index_path)
+            return
+        self.entries = {
+            fingerprint: entry
+            for fingerprint, entry in entries.items()
+            if self._is_valid_entry(entry)
+        }
+        if len(self.entries) != len(entries):
+            logging.warning(
+                "Dropped %d malformed entries from result cache %s",
+                len(entries) - len(self.entries),
+                self.index_path,
+            )
+
+    @staticmethod
+    def _is_valid_entry(entry):
+        """Return True if a loaded cache entry has the fields the cache relies on."""
+        return (
+            isinstance(entry, dict)
+            and isinstance(entry.get("verdict"), bool)
+            and all(
+                isinstance(entry.get(key), (int, float))
+                for key in ("recorded", "last_used")
+            )
+        )
+
+    def save(self):
+        """Evict stale entries and write the cache index to disk."""
+        self._evict()
+        temp_path = self.index_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=4)
+        os.replace(temp_path, self.index_path)
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones over the limit."""
+        now = time.time()
+        self.entries = {
+            fingerprint: entry
+            for fingerprint, entry in self.entries.items()
+            if now - entry["recorded"] <= self.settings["max_age"]
+        }
+        overflow = len(self.entries) - self.settings["max_entries"]
+        if overflow > 0:
+            oldest = sorted(
+                self.entries, key=lambda key: self.entries[key]["last_used"]
+            )
+            for fingerprint in oldest[:overflow]:
+                del self.entries[fingerprint]
+
+    def _hash_file(self, path):
+        """Return the SHA-256 of a file's contents, memoized per path."""
+        if not path:
+            return ""
+        if path not in self._file_hashes:
+            digest = hashlib.sha256()
+            try:
+                with open(path, "rb") as file:
+                    for chunk in iter(lambda: file.read(1 << 20), b""):
+                        digest.update(chunk)
+                self._file_hashes[path] = digest.hexdigest()
+            except OSError:
+                self._file_hashes[path] = "missing"
+        return self._file_hashes[path]
+
+    def fingerprint_element(self, element, previous=""):
+        """
+        Compute the fingerprint of a config step.
+
+        Args:
+            element (dict): Step definition from the config.
+            previous (str): Fingerprint of the step before it, if any.
+
+        Returns:
+            str: Hex digest identifying the step, its reference images, the build
+            and the steps leading up to it.
+        """
+        payload = {
+            "previous": previous,
+            "element": element,
+            "element_image": self._hash_file(element.get("element_image")),
+            "expected_output": self._hash_file(element.get("expected_output")),
+            "build_id": self.build_id,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def fingerprint_steps(self, elements):
+        """
+        Compute chained fingerprints for the steps of a config.
+
+        Each fingerprint includes the previous one, so a change to any step
+        invalidates every step after it.
+
+        Args:
+            elements (list[dict]): Step definitions in run order.
+
+        Returns:
+            list[str]: One fingerprint per step.
+        """
+        fingerprints = []
+        previous = ""
+        for element in elements:
+            previous = self.fingerprint_element(element, previous)
+            fingerprints.append(previous)
+        return fingerprints
+
+    @staticmethod
+    def fingerprint_config(element_fingerprints):
+        """Combine the step fingerprints of a config into a single fingerprint."""
+        return hashlib.sha256(
+            "\n".join(element_fingerprints).encode("utf-8")
+        ).hexdigest()
+
+    def passed_before(self, fingerprint):
+        """Return True if the fingerprint has a cached passing verdict."""
+        entry = self.entries.get(fingerprint)
+        return bool(entry and entry["verdict"])
+
+    def touch(self, fingerprints):
+        """
+        Mark cached entries as used without running them.
+
+        Called for the steps of a skipped config so LRU eviction keeps them.
+
+        Args:
+            fingerprints (list[str]): Fingerprints to refresh.
+        """
+        now = time.time()
+        for fingerprint in fingerprints:
+            if fingerprint in self.entries:
+                self.entries[fingerprint]["last_used"] = now
+
+    def should_skip(self, fingerprint, name, scope="step"):
+        """
+        Decide whether a step or config can be skipped and record it if so.
+
+        Only fingerprints whose cached verdict was a pass are skipped; a
+        fraction of them, set by `spot_check_rate`, is run anyway.
+
+        Args:
+            fingerprint (str): Fingerprint of the step or config.
+            name (str): Name used in the skip report.
+            scope (str): Either "step" or "config".
+
+        Returns:
+            bool: True if the step or config should be skipped.
+        """
+        if not self.passed_before(fingerprint):
+            return False
+        self.touch([fingerprint])
+        if random.random() < self.settings["spot_check_rate"]:
+            logging.info("Spot-checking cached %s %s", scope, name)
+            return False
+        self.skipped.append(
+            {"name": name, "scope": scope, "fingerprint": fingerprint}
+        )
+        logging.info("Skipping unchanged %s %s", scope, name)
+        return True
+
+    def store(self, fingerprint, name, verdict):
+        """
+        Record the verdict for a step or config.
+
+        Args:
+            fingerprint (str): Fingerprint of the step or config.
+            name (str): Name of the step or config.
+            verdict (bool): True if the step or config passed.
+        """
+        now = time.time()
+        self.entries[fingerprint] = {
+            "name": name,
+            "verdict": bool(verdict),
+            "build_id": self.build_id,
+            "recorded": now,
+            "last_used": now,
+        }
+
+    def write_skip_report(self, report_path):
+        """
+        Write the list of skipped steps and configs to a JSON file.
+
+        Args:
+            report_path (Path): Path of the report file.
+
+        Returns:
+            Path: Path of the written report.
+        """
+        with open(report_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"build_id": self.build_id, "skipped": self.skipped}, file, indent=4
+            )
+        return report_path
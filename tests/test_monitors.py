@@ -0,0 +1,128 @@
+"""
+Tests for the monitor layout lookups and coordinate translation.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.auto_ui_test import monitors
+from src.auto_ui_test.monitors import Monitor, MonitorLayout
+
+
+@pytest.fixture(name="layout")
+def fixture_layout():
+    """A 1080p primary, a taller 1440p panel to its right and one stacked above."""
+    return MonitorLayout(
+        [
+            Monitor(1, (0, 0, 1920, 1080), is_primary=True, name="DISPLAY1"),
+            Monitor(2, (1920, -360, 2560, 1440), name="DISPLAY2"),
+            Monitor(3, (0, -1080, 1920, 1080), name="DISPLAY3"),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "point, expected",
+    [
+        ((0, 0), 1),
+        ((1919, 1079), 1),
+        ((10, -1), 3),
+        ((0, -1080), 3),
+        ((1920, -360), 2),
+        ((4479, 1079), 2),
+        ((2000, 0), 2),
+    ],
+)
+def test_monitor_at(layout, point, expected):
+    """Points resolve to the monitor containing them, edges included."""
+    assert layout.monitor_at(*point).index == expected
+
+
+@pytest.mark.parametrize(
+    "point",
+    [(1920, -361), (4480, 0), (1000, 1080), (-1, 0), (0, -1081), (2000, 1080)],
+)
+def test_monitor_at_outside(layout, point):
+    """Points past right/bottom edges, in gaps or off the desktop match nothing."""
+    assert layout.monitor_at(*point) is None
+
+
+def test_to_local_and_back(layout):
+    """Local coordinates on any monitor translate back to the same desktop point."""
+    monitor, local_x, local_y = layout.to_local(2000, -300)
+    assert (monitor.index, local_x, local_y) == (2, 80, 60)
+    assert layout.to_global(2, local_x, local_y) == (2000, -300)
+
+    monitor, local_x, local_y = layout.to_local(5, -5)
+    assert (monitor.index, local_x, local_y) == (3, 5, 1075)
+    assert layout.to_global(3, local_x, local_y) == (5, -5)
+
+
+def test_to_local_outside_uses_primary(layout):
+    """Points in a gap are expressed relative to the primary monitor."""
+    monitor, local_x, local_y = layout.to_local(1000, 1200)
+    assert (monitor.index, local_x, local_y) == (1, 1000, 1200)
+
+
+def test_negative_origin_primary():
+    """A primary monitor to the right of a secondary one keeps negative coordinates."""
+    layout = MonitorLayout(
+        [
+            Monitor(1, (0, 0, 2560, 1440), is_primary=True),
+            Monitor(2, (-1920, 360, 1920, 1080)),
+        ]
+    )
+    assert layout.monitor_at(-1, 360).index == 2
+    assert layout.monitor_at(-1, 359) is None
+    assert layout.to_local(-1920, 1439)[1:] == (0, 1079)
+    assert layout.to_global(2, 0, 0) == (-1920, 360)
+
+
+def test_resolve_prefers_name_then_geometry(layout, caplog):
+    """Recorded monitors are matched by name, then geometry, before the index."""
+    assert layout.resolve(1, "DISPLAY2", None).index == 2
+    assert layout.resolve(1, None, [0, -1080, 1920, 1080]).index == 3
+    assert not caplog.records
+
+
+def test_resolve_falls_back_with_warning(layout, caplog):
+    """Unknown monitors fall back to the index, then the primary, with a warning."""
+    assert layout.resolve(2, "GONE", [9, 9, 9, 9]).index == 2
+    assert layout.resolve(7, None, None).is_primary
+    assert len(caplog.records) == 2
+    assert layout.resolve_element({}).is_primary
+
+
+class _FakeScreen:
+    """Stands in for mss, recording the rectangle that was grabbed."""
+
+    grabbed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def grab(self, rectangle):
+        """Record the rectangle and return a blank BGRA shot of its size."""
+        self.grabbed.append(rectangle)
+        size = (rectangle["width"], rectangle["height"])
+        return SimpleNamespace(size=size, bgra=bytes(4 * size[0] * size[1]))
+
+
+def test_capture_monitor_clamps_region(monkeypatch):
+    """Regions reaching past a monitor edge are clamped before grabbing."""
+    monkeypatch.setattr(monitors.mss, "mss", _FakeScreen)
+    _FakeScreen.grabbed = []
+    monitor = Monitor(2, (-1920, 360, 1920, 1080))
+
+    image = monitors.capture_monitor(monitor, (1870, -50, 100, 100))
+    assert _FakeScreen.grabbed == [
+        {"left": -50, "top": 360, "width": 50, "height": 50}
+    ]
+    assert image.size == (50, 50)
+
+    with pytest.raises(ValueError):
+        monitors.capture_monitor(monitor, (1920, 0, 100, 100))
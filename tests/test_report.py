@@ -0,0 +1,113 @@
+"""
+Tests for the visual diff report generator.
+"""
+
+import re
+
+import cv2
+import numpy as np
+import pytest
+
+from src.auto_ui_test.report import VisualDiffReport
+
+
+@pytest.fixture(name="images")
+def fixture_images(tmp_path):
+    """A blank reference and a new image with five changed blocks."""
+    reference = np.zeros((120, 400, 3), np.uint8)
+    new = reference.copy()
+    regions = []
+    for index in range(5):
+        x = 10 + index * 70
+        new[20:60, x : x + 40] = 255
+        regions.append((x, 20, 40, 40))
+    cv2.imwrite(str(tmp_path / "reference.png"), reference)
+    cv2.imwrite(str(tmp_path / "new.png"), new)
+    return tmp_path / "reference.png", tmp_path / "new.png", regions
+
+
+def _comparison(name, reference, new, regions):
+    return {
+        "name": name,
+        "reference": reference,
+        "new": new,
+        "score": 0.5,
+        "similar": False,
+        "regions": regions,
+    }
+
+
+def test_thumbnails_and_crops_are_bounded(tmp_path, images):
+    """Written images never exceed the thumbnail width or the crop limit."""
+    report = VisualDiffReport(tmp_path / "report", thumbnail_width=64, max_crops=2)
+    report.add(_comparison("Alarm", *images))
+    report.generate()
+
+    written = sorted((tmp_path / "report").glob("*.png"))
+    assert written
+    for path in written:
+        assert cv2.imread(str(path)).shape[1] <= 64
+    assert len([path for path in written if "_crop" in path.name]) == 2
+
+
+def test_full_size_images_load_on_demand(tmp_path, images):
+    """Full-size screenshots are only referenced through data-src, never src."""
+    report = VisualDiffReport(tmp_path / "report")
+    report.add(_comparison("Alarm", *images))
+    index = report.generate().read_text(encoding="utf-8")
+
+    for name in ("reference.png", "new.png"):
+        assert f'data-src="../{name}"' in index
+        assert not re.search(rf'(?<!data-)src="\.\./{name}"', index)
+
+
+def test_clear_previous_removes_stale_images(tmp_path, images):
+    """A shorter run leaves no images from a longer earlier run behind."""
+    output_dir = tmp_path / "report"
+    longer = VisualDiffReport(output_dir)
+    for name in ("First", "Second", "Third"):
+        longer.add(_comparison(name, *images))
+    longer.generate()
+
+    shorter = VisualDiffReport(output_dir)
+    shorter.add(_comparison("Only", *images))
+    shorter.generate()
+
+    assert {path.name.split("_")[0] for path in output_dir.glob("*.png")} == {"0000"}
+    assert not list(output_dir.glob("*First*"))
+
+
+def test_unreadable_reference_still_listed(tmp_path, images):
+    """A missing reference image is reported without raising."""
+    _, new, regions = images
+    report = VisualDiffReport(tmp_path / "report")
+    report.add(_comparison("Broken", tmp_path / "missing.png", new, regions))
+    index = report.generate().read_text(encoding="utf-8")
+
+    assert "<h2>Broken</h2>" in index
+    assert not list((tmp_path / "report").glob("*.png"))
+
+
+def test_empty_report_replaces_previous_index(tmp_path, images):
+    """Generating without comparisons still rewrites the index."""
+    output_dir = tmp_path / "report"
+    previous = VisualDiffReport(output_dir)
+    previous.add(_comparison("Old", *images))
+    previous.generate()
+
+    index = VisualDiffReport(output_dir).generate().read_text(encoding="utf-8")
+    assert "Old" not in index
+    assert "0 comparisons" in index
+
+
+def test_skipped_items_are_listed(tmp_path):
+    """Steps skipped by an incremental run are listed and the skip report linked."""
+    report = VisualDiffReport(tmp_path / "report")
+    report.add_skipped(
+        [{"name": "Alarm Button", "scope": "step"}], tmp_path / "skipped_steps.json"
+    )
+    index = report.generate().read_text(encoding="utf-8")
+
+    assert "1 skipped as unchanged" in index
+    assert "<li>Alarm Button (step)</li>" in index
+    assert 'href="../skipped_steps.json"' in index
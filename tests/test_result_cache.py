@@ -0,0 +1,158 @@
+"""
+Tests for the on-disk result cache used by incremental runs.
+"""
+
+import json
+
+import pytest
+
+from src.auto_ui_test.result_cache import ResultCache
+
+
+@pytest.fixture(name="element")
+def fixture_element(tmp_path):
+    """A config step whose reference images exist on disk."""
+    (tmp_path / "button.png").write_bytes(b"button")
+    (tmp_path / "output.png").write_bytes(b"output")
+    return {
+        "name": "Alarm Button",
+        "action": "click",
+        "element_image": str(tmp_path / "button.png"),
+        "expected_output": str(tmp_path / "output.png"),
+    }
+
+
+def test_fingerprint_is_stable(tmp_path, element):
+    """The same step, images and build give the same fingerprint."""
+    first = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(element)
+    second = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(dict(element))
+    assert first == second
+
+
+@pytest.mark.parametrize("key", ["element_image", "expected_output"])
+def test_fingerprint_changes_with_image_bytes(tmp_path, element, key):
+    """Changing the contents of a reference image changes the fingerprint."""
+    before = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(element)
+    with open(element[key], "ab") as file:
+        file.write(b"changed")
+    after = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(element)
+    assert before != after
+
+
+def test_fingerprint_changes_with_build_and_definition(tmp_path, element):
+    """A new build ID or an edited step definition changes the fingerprint."""
+    base = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(element)
+    new_build = ResultCache(tmp_path / "cache", "1.1").fingerprint_element(element)
+    edited = ResultCache(tmp_path / "cache", "1.0").fingerprint_element(
+        dict(element, action="input_text")
+    )
+    assert len({base, new_build, edited}) == 3
+
+
+def test_editing_a_step_invalidates_later_steps(tmp_path, element):
+    """Changing step 1 makes step 2 run again even though step 2 is unchanged."""
+    steps = [element, dict(element, name="Stopwatch Button")]
+    cache = ResultCache(tmp_path / "cache", "1.0")
+    for fingerprint, step in zip(cache.fingerprint_steps(steps), steps):
+        cache.store(fingerprint, step["name"], True)
+
+    edited = [dict(element, action="double_click"), steps[1]]
+    fingerprints = cache.fingerprint_steps(edited)
+    assert not cache.should_skip(fingerprints[0], edited[0]["name"])
+    assert not cache.should_skip(fingerprints[1], edited[1]["name"])
+    assert cache.should_skip(cache.fingerprint_steps(steps)[1], steps[1]["name"])
+
+
+def test_skips_only_passing_verdicts(tmp_path):
+    """Only fingerprints that passed before are skipped, and only after saving."""
+    cache = ResultCache(tmp_path, "1.0")
+    assert not cache.should_skip("pass", "a")
+    cache.store("pass", "a", True)
+    cache.store("fail", "b", False)
+    cache.save()
+
+    reloaded = ResultCache(tmp_path, "1.0")
+    assert reloaded.should_skip("pass", "a")
+    assert not reloaded.should_skip("fail", "b")
+
+
+def test_spot_check_runs_everything_at_full_rate(tmp_path):
+    """With a spot-check rate of 1 nothing is skipped."""
+    cache = ResultCache(tmp_path, "1.0", {"spot_check_rate": 1.0})
+    cache.store("pass", "a", True)
+    assert not cache.should_skip("pass", "a")
+    assert not cache.skipped
+
+
+@pytest.mark.parametrize("rate", [-0.1, 1.5])
+def test_spot_check_rate_out_of_range(tmp_path, rate):
+    """Spot-check rates outside [0, 1] are rejected."""
+    with pytest.raises(ValueError):
+        ResultCache(tmp_path, "1.0", {"spot_check_rate": rate})
+
+
+def test_evicts_expired_entries(tmp_path):
+    """Entries older than the maximum age are dropped on save."""
+    cache = ResultCache(tmp_path, "1.0", {"max_age_days": 1})
+    cache.store("old", "a", True)
+    cache.store("new", "b", True)
+    cache.entries["old"]["recorded"] -= 2 * 24 * 60 * 60
+    cache.save()
+    assert set(ResultCache(tmp_path, "1.0").entries) == {"new"}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Over the entry limit, the least recently used entries are dropped."""
+    cache = ResultCache(tmp_path, "1.0", {"max_entries": 2})
+    for number, fingerprint in enumerate(["a", "b", "c"]):
+        cache.store(fingerprint, fingerprint, True)
+        cache.entries[fingerprint]["last_used"] = number
+    cache.touch(["a"])
+    cache.save()
+    assert set(cache.entries) == {"a", "c"}
+
+
+def test_corrupt_index_starts_empty(tmp_path):
+    """An unreadable index is ignored instead of aborting the run."""
+    (tmp_path / "results.json").write_text("{not json", encoding="utf-8")
+    cache = ResultCache(tmp_path, "1.0")
+    assert not cache.entries
+    cache.store("a", "a", True)
+    cache.save()
+    assert ResultCache(tmp_path, "1.0").passed_before("a")
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        [],
+        {"a": "not an entry"},
+        {"a": {"verdict": True, "recorded": 0}},
+        {"a": {"verdict": "yes", "recorded": 0, "last_used": 0}},
+    ],
+)
+def test_malformed_index_entries_are_dropped(tmp_path, index):
+    """Valid JSON with the wrong shape is ignored instead of breaking the run."""
+    (tmp_path / "results.json").write_text(json.dumps(index), encoding="utf-8")
+    cache = ResultCache(tmp_path, "1.0")
+    assert not cache.entries
+    assert not cache.passed_before("a")
+    cache.save()
+
+
+def test_skip_report(tmp_path):
+    """The skip report lists every skipped step and config with the build ID."""
+    cache = ResultCache(tmp_path, "1.0")
+    cache.store("config", "config.json", True)
+    cache.store("step", "Alarm Button", True)
+    cache.should_skip("config", "config.json", scope="config")
+    cache.should_skip("step", "Alarm Button")
+
+    report_path = cache.write_skip_report(tmp_path / "skipped_steps.json")
+    with open(report_path, "r", encoding="utf-8") as file:
+        report = json.load(file)
+    assert report["build_id"] == "1.0"
+    assert [(item["name"], item["scope"]) for item in report["skipped"]] == [
+        ("config.json", "config"),
+        ("Alarm Button", "step"),
+    ]